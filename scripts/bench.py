@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Async load test / benchmark for the server.
+Usage: python scripts/bench.py [--rows 10000] [--concurrency 50] [--duration 30]
+       python scripts/bench.py --url http://localhost:3000 --mix feedback=1,paginate=1
+       python scripts/bench.py --compare bench-results/previous.json
+
+By default it seeds a temporary SQLite database with --rows feedback rows, starts
+serve.py against it on a free port, and runs --concurrency virtual users for
+--duration seconds. Each user has its own cookie session and repeatedly runs a flow
+picked from --mix:
+  riddle    GET /riddle, fetch the answer (local runs), POST /solve, GET /
+  feedback  a burst of POST /api/feedback plus one POST /api/feedback/batch
+  paginate  walk /api/feedbacks by cursor, then one deep page=/pageSize= request
+  export    stream the full /api/feedbacks.csv?all=true
+  browse    /config, /api/feedbacks/search, /api/feedbacks/stats, /img, /metrics
+Requests per second and p50/p95/p99 latencies are reported per operation and saved
+as JSON (--out). With --compare, p95 and throughput are checked against an earlier
+run and the exit status is 1 if anything regressed by more than --threshold percent.
+Requires: aiohttp (pip install aiohttp)
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import socket
+import asyncio
+import argparse
+import tempfile
+import platform
+import subprocess
+import urllib.request
+from datetime import datetime, timedelta
+
+try:
+    import aiohttp
+except Exception:
+    print('This script requires the aiohttp package. Install with: pip install aiohttp')
+    sys.exit(1)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MIX = 'riddle=4,feedback=2,paginate=2,browse=3,export=1'
+WORDS = ('great', 'riddle', 'portfolio', 'design', 'slow', 'loved', 'broken', 'colors', 'network', 'answer')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Load test the server and report latency percentiles.')
+    parser.add_argument('--url', help='benchmark an already running server instead of starting one')
+    parser.add_argument('--rows', type=int, default=10000, help='feedback rows to seed the temporary database with')
+    parser.add_argument('--concurrency', '-c', type=int, default=50, help='concurrent virtual users (connections)')
+    parser.add_argument('--duration', '-d', type=float, default=30, help='seconds to run')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='flow weights, default: ' + DEFAULT_MIX)
+    parser.add_argument('--pages', type=int, default=20, help='cursor pages walked by the paginate flow')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='serve.py worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='serve.py threads per worker')
+    parser.add_argument('--out', help='results file (default: bench-results/bench-<timestamp>.json)')
+    parser.add_argument('--compare', help='earlier results file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=20.0, help='allowed regression in percent (default 20)')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for flow selection and payloads')
+    return parser.parse_args()
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in FLOWS:
+            raise SystemExit('Unknown flow {!r}; choose from {}'.format(name, ', '.join(sorted(FLOWS))))
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def random_message(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 30)))
+
+
+# --- Local server: temporary database, seeding, serve.py subprocess ---
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def local_env(tmpdir):
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': 'sqlite:///' + os.path.join(tmpdir, 'bench.db').replace('\\', '/'),
+        'DATA_VERSION_FILE': os.path.join(tmpdir, 'feedback.version'),
+        'METRICS_DIR': os.path.join(tmpdir, 'metrics'),
+        'IMAGE_CACHE_DIR': os.path.join(tmpdir, 'img-cache'),
+        # lets the riddle flow solve riddles correctly and reach the unlocked page
+        'DEBUG_SHOW_ANSWER': '1',
+    })
+    return env
+
+
+def seed_database(env, rows, rng, chunk=5000):
+    # goes through the app's own write path so counters, search index and rollups match
+    print('Seeding', rows, 'feedback rows ...')
+    os.environ.update(env)
+    # the seeding itself should not show up in the server's /metrics
+    os.environ['METRICS_ENABLED'] = '0'
+    sys.path.insert(0, ROOT)
+    from server import app, db, _store_feedbacks
+    now = datetime.utcnow()
+    with app.app_context():
+        db.create_all()
+        for start in range(0, rows, chunk):
+            _store_feedbacks([{
+                'name': 'user{}'.format(rng.randrange(rows // 5 + 1)),
+                'email': None,
+                'message': random_message(rng),
+                'created_at': now - timedelta(seconds=rng.randrange(30 * 24 * 3600)),
+            } for _ in range(min(chunk, rows - start))])
+        db.engine.dispose()
+
+
+def start_server(env, port, workers, threads):
+    cmd = [sys.executable, os.path.join(ROOT, 'serve.py'), '--host', '127.0.0.1', '--port', str(port),
+           '--workers', str(workers), '--threads', str(threads)]
+    proc = subprocess.Popen(cmd, env=env, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = 'http://127.0.0.1:{}'.format(port)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit('serve.py exited with status {}'.format(proc.returncode))
+        try:
+            urllib.request.urlopen(url + '/config', timeout=1).read()
+            return proc, url
+        except Exception:
+            time.sleep(0.2)
+    proc.terminate()
+    raise SystemExit('serve.py did not start within 30 seconds')
+
+
+# --- Load generation ---
+
+class Recorder:
+    def __init__(self):
+        self.ops = {}
+
+    def add(self, op, elapsed, ok, nbytes):
+        r = self.ops.setdefault(op, {'latencies': [], 'errors': 0, 'bytes': 0})
+        r['latencies'].append(elapsed)
+        r['bytes'] += nbytes
+        if not ok:
+            r['errors'] += 1
+
+
+class User:
+    """One virtual user: a cookie-keeping session that issues requests sequentially."""
+
+    def __init__(self, base, session, recorder, rng, args, debug_answers):
+        self.base = base
+        self.session = session
+        self.recorder = recorder
+        self.rng = rng
+        self.args = args
+        self.debug_answers = debug_answers
+
+    async def call(self, op, method, path, want_json=False, **kwargs):
+        start = time.perf_counter()
+        ok, body, nbytes = False, None, 0
+        try:
+            async with self.session.request(method, self.base + path, **kwargs) as resp:
+                if want_json:
+                    raw = await resp.read()
+                    nbytes = len(raw)
+                    body = json.loads(raw) if raw else None
+                else:
+                    # stream so large exports are not held in memory
+                    async for chunk in resp.content.iter_chunked(65536):
+                        nbytes += len(chunk)
+                ok = resp.status < 400
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            pass
+        self.recorder.add(op, time.perf_counter() - start, ok, nbytes)
+        return body
+
+
+async def flow_riddle(u):
+    await u.call('riddle', 'GET', '/riddle')
+    answer = None
+    if u.debug_answers:
+        j = await u.call('debug_answer', 'GET', '/_debug_answer', want_json=True)
+        answer = j.get('answer') if j else None
+    await u.call('solve', 'POST', '/solve', json={'answer': answer or 'wrong'})
+    await u.call('index', 'GET', '/')
+
+
+async def flow_feedback(u):
+    for _ in range(5):
+        await u.call('feedback', 'POST', '/api/feedback', json={'name': 'bench', 'message': random_message(u.rng)})
+    batch = [{'name': 'bench', 'message': random_message(u.rng)} for _ in range(20)]
+    await u.call('feedback_batch', 'POST', '/api/feedback/batch', json=batch)
+
+
+async def flow_paginate(u):
+    cursor = ''
+    for _ in range(u.args.pages):
+        j = await u.call('feedbacks_cursor', 'GET', '/api/feedbacks', want_json=True,
+                         params={'cursor': cursor, 'pageSize': '50'})
+        cursor = j.get('next_cursor') if j else None
+        if not cursor:
+            break
+    deep = max(1, u.args.rows // 50 // 2)
+    await u.call('feedbacks_offset', 'GET', '/api/feedbacks', params={'page': str(deep), 'pageSize': '50'})
+
+
+async def flow_export(u):
+    await u.call('export_csv', 'GET', '/api/feedbacks.csv', params={'all': 'true'})
+
+
+async def flow_browse(u):
+    await u.call('config', 'GET', '/config')
+    await u.call('search', 'GET', '/api/feedbacks/search', params={'q': u.rng.choice(WORDS)})
+    await u.call('stats', 'GET', '/api/feedbacks/stats', params={'bucket': 'day'})
+    await u.call('image', 'GET', '/img/github_foundations.png', params={'w': '320', 'fmt': 'webp'})
+    await u.call('metrics', 'GET', '/metrics')
+
+
+FLOWS = {
+    'riddle': flow_riddle,
+    'feedback': flow_feedback,
+    'paginate': flow_paginate,
+    'export': flow_export,
+    'browse': flow_browse,
+}
+
+
+async def run_load(base, args, mix, debug_answers):
+    recorder = Recorder()
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    deadline = time.monotonic() + args.duration
+    timeout = aiohttp.ClientTimeout(total=300)
+
+    async def user_loop(i):
+        rng = random.Random(args.seed * 100003 + i)
+        # unsafe=True keeps cookies for IP-address hosts such as 127.0.0.1
+        async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True), timeout=timeout,
+                                         connector=aiohttp.TCPConnector(limit=1)) as session:
+            u = User(base, session, recorder, rng, args, debug_answers)
+            while time.monotonic() < deadline:
+                await FLOWS[rng.choices(names, weights)[0]](u)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user_loop(i) for i in range(args.concurrency)))
+    return recorder, time.perf_counter() - started
+
+
+# --- Reporting ---
+
+def percentile(sorted_values, pct):
+    # nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(latencies, errors, nbytes, elapsed):
+    lat = sorted(latencies)
+    ms = lambda v: round(v * 1000, 2)
+    return {
+        'count': len(lat),
+        'errors': errors,
+        'rps': round(len(lat) / elapsed, 2) if elapsed else 0,
+        'mean_ms': ms(sum(lat) / len(lat)) if lat else 0,
+        'p50_ms': ms(percentile(lat, 50)),
+        'p95_ms': ms(percentile(lat, 95)),
+        'p99_ms': ms(percentile(lat, 99)),
+        'max_ms': ms(lat[-1]) if lat else 0,
+        'bytes': nbytes,
+    }
+
+
+def build_results(recorder, elapsed, args, base):
+    ops = {op: summarize(r['latencies'], r['errors'], r['bytes'], elapsed) for op, r in sorted(recorder.ops.items())}
+    overall = summarize([v for r in recorder.ops.values() for v in r['latencies']],
+                        sum(r['errors'] for r in recorder.ops.values()),
+                        sum(r['bytes'] for r in recorder.ops.values()), elapsed)
+    try:
+        rev = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                      stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        rev = None
+    return {
+        'meta': {
+            'started': datetime.utcnow().isoformat() + 'Z',
+            'git_rev': rev,
+            'target': base if args.url else 'local',
+            'python': platform.python_version(),
+            'elapsed_s': round(elapsed, 2),
+            'args': {k: v for k, v in vars(args).items() if k not in ('out', 'compare')},
+        },
+        'overall': overall,
+        'ops': ops,
+    }
+
+
+def print_report(results):
+    header = '{:<20} {:>8} {:>6} {:>9} {:>9} {:>9} {:>9}'.format('operation', 'count', 'errors', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms')
+    print(header)
+    print('-' * len(header))
+    rows = list(results['ops'].items()) + [('TOTAL', results['overall'])]
+    for op, s in rows:
+        print('{:<20} {:>8} {:>6} {:>9} {:>9} {:>9} {:>9}'.format(op, s['count'], s['errors'], s['rps'], s['p50_ms'], s['p95_ms'], s['p99_ms']))
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print('\nCompared with', baseline_path, '(rev {})'.format(baseline['meta'].get('git_rev')))
+    regressions = []
+    rows = list(results['ops'].items()) + [('TOTAL', results['overall'])]
+    for op, s in rows:
+        b = baseline['overall'] if op == 'TOTAL' else baseline['ops'].get(op)
+        if not b or not b['count']:
+            continue
+        d_p95 = 100.0 * (s['p95_ms'] - b['p95_ms']) / b['p95_ms'] if b['p95_ms'] else 0.0
+        d_rps = 100.0 * (s['rps'] - b['rps']) / b['rps'] if b['rps'] else 0.0
+        flag = ''
+        if d_p95 > threshold or d_rps < -threshold:
+            flag = '  REGRESSION'
+            regressions.append(op)
+        print('{:<20} p95 {:>9} -> {:>9} ({:+6.1f}%)  req/s {:>9} -> {:>9} ({:+6.1f}%){}'.format(
+            op, b['p95_ms'], s['p95_ms'], d_p95, b['rps'], s['rps'], d_rps, flag))
+    return regressions
+
+
+def main():
+    args = parse_args()
+    mix = parse_mix(args.mix)
+    proc = None
+    tmp = None
+    if args.url:
+        base = args.url.rstrip('/')
+        debug_answers = False
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix='bench-')
+        env = local_env(tmp.name)
+        seed_database(env, args.rows, random.Random(args.seed))
+        proc, base = start_server(env, free_port(), args.workers, args.threads)
+        debug_answers = True
+    try:
+        print('Running {} users for {}s against {} (mix: {})'.format(args.concurrency, args.duration, base, args.mix))
+        recorder, elapsed = asyncio.run(run_load(base, args, mix, debug_answers))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+        if tmp is not None:
+            tmp.cleanup()
+
+    results = build_results(recorder, elapsed, args, base)
+    print_report(results)
+    out = args.out or os.path.join(ROOT, 'bench-results', 'bench-{}.json'.format(datetime.now().strftime('%Y%m%d-%H%M%S')))
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print('\nResults saved to', out)
+    if args.compare and compare(results, args.compare, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Build the static front-end from public/ into build/ for the server to serve.
+Usage: python scripts/build_assets.py [--out build] [--pages]
+
+Every non-HTML file gets a content-hashed copy (app.js -> app.<hash>.js) that the
+server sends with `Cache-Control: immutable`; HTML pages are rewritten to reference
+the hashed names. Compressible files get precompressed .gz and .br variants (brotli
+needs the Brotli package: pip install Brotli). build/manifest.json maps each public
+path to its file, hash and available encodings; server.py picks it up on start.
+
+--pages writes a plain static-hosting layout instead (original names next to the
+hashed copies, no precompressed variants or manifest); CI uses it to generate docs/.
+"""
+import os
+import re
+import sys
+import gzip
+import json
+import shutil
+import hashlib
+import argparse
+import mimetypes
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, 'public')
+COMPRESSIBLE = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+# relative src/href references inside HTML, e.g. href="style.css" or src="/app.js"
+REF_RE = re.compile(r'(\b(?:src|href)=")(/?)([^"#?:]+)(")')
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def hashed_name(rel, digest):
+    base, ext = os.path.splitext(rel)
+    return '{}.{}{}'.format(base, digest, ext)
+
+
+def is_compressible(rel):
+    mimetype = mimetypes.guess_type(rel)[0] or ''
+    return mimetype.startswith(COMPRESSIBLE)
+
+
+def source_files():
+    for dirpath, _, filenames in os.walk(SRC):
+        for fn in sorted(filenames):
+            full = os.path.join(dirpath, fn)
+            yield os.path.relpath(full, SRC).replace(os.sep, '/'), full
+
+
+def write(out, rel, data):
+    path = os.path.join(out, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def write_variants(out, rel, data):
+    # only keep a variant when it is actually smaller than the original
+    encodings = []
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) < len(data):
+            write(out, rel + '.br', br)
+            encodings.append('br')
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) < len(data):
+        write(out, rel + '.gz', gz)
+        encodings.append('gzip')
+    return encodings
+
+
+def build(out, pages=False):
+    files = {}
+    html = []
+    for rel, full in source_files():
+        if rel.endswith('.html'):
+            html.append((rel, full))
+            continue
+        with open(full, 'rb') as f:
+            data = f.read()
+        digest = content_hash(data)
+        target = hashed_name(rel, digest)
+        write(out, target, data)
+        if pages:
+            write(out, rel, data)
+        encodings = [] if pages or not is_compressible(rel) else write_variants(out, target, data)
+        files[rel] = {'file': target, 'hash': digest, 'encodings': encodings}
+
+    def rewrite(m):
+        entry = files.get(m.group(3))
+        if entry is None:
+            return m.group(0)
+        return m.group(1) + m.group(2) + entry['file'] + m.group(4)
+
+    # pages are entry points and keep their names; only their references change
+    for rel, full in html:
+        with open(full, encoding='utf-8') as f:
+            data = REF_RE.sub(rewrite, f.read()).encode('utf-8')
+        write(out, rel, data)
+        encodings = [] if pages else write_variants(out, rel, data)
+        files[rel] = {'file': rel, 'hash': content_hash(data), 'encodings': encodings}
+
+    if not pages:
+        with open(os.path.join(out, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({'files': files}, f, indent=2, sort_keys=True)
+    return files
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fingerprint and precompress public/ assets.')
+    parser.add_argument('--out', default=os.path.join(ROOT, 'build'), help='output directory (default: build/)')
+    parser.add_argument('--pages', action='store_true', help='static hosting layout for GitHub Pages (docs/)')
+    args = parser.parse_args()
+    out = os.path.abspath(args.out)
+    if out == SRC:
+        print('Refusing to build into public/')
+        sys.exit(1)
+    if brotli is None and not args.pages:
+        print('Warning: Brotli not installed — skipping .br variants. Install with: pip install Brotli')
+    shutil.rmtree(out, ignore_errors=True)
+    files = build(out, pages=args.pages)
+    print('Built', len(files), 'assets into', out)
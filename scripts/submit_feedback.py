@@ -2,9 +2,14 @@
 """
 Simple convenience script to submit feedback to the local server.
 Usage: python scripts/submit_feedback.py
+       python scripts/submit_feedback.py --file messages.ndjson [--chunk 500]
+With --file, messages are read from a JSON array or NDJSON file (objects with
+name/email/message) and sent through POST /api/feedback/batch in chunks.
 Requires: requests (pip install requests)
 """
 import sys
+import json
+import argparse
 try:
     import requests
 except Exception:
@@ -13,6 +18,7 @@ except Exception:
 
 import os
 API = os.environ.get('FEEDBACK_API') or 'http://localhost:3000/api/feedback'
+BATCH_API = os.environ.get('FEEDBACK_BATCH_API') or API.rstrip('/') + '/batch'
 
 def prompt(prompt_text):
     try:
@@ -20,7 +26,35 @@ def prompt(prompt_text):
     except EOFError:
         return ''
 
-if __name__ == '__main__':
+def load_messages(path):
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+def submit_file(path, chunk):
+    messages = load_messages(path)
+    print('Submitting', len(messages), 'messages to', BATCH_API)
+    sent = 0
+    for start in range(0, len(messages), chunk):
+        part = messages[start:start + chunk]
+        try:
+            r = requests.post(BATCH_API, json=part, timeout=60)
+            j = r.json()
+        except Exception as e:
+            print('Failed to submit batch starting at message', start, ':', e)
+            return 1
+        if not j.get('ok'):
+            # the server rejects a whole batch if any entry is invalid
+            invalid = [start + i for i in j.get('invalid', [])]
+            print('Server returned error for batch starting at message', start, ':', j.get('error'), invalid or '')
+            return 1
+        sent += j.get('count', len(part))
+    print('Feedback submitted:', sent, 'messages')
+    return 0
+
+def submit_interactive():
     print('Submit feedback to', API)
     name = prompt('Name (optional): ').strip()
     email = prompt('Email (optional): ').strip()
@@ -37,7 +71,7 @@ if __name__ == '__main__':
     message = '\n'.join(lines).strip()
     if not message:
         print('No message provided, aborting.')
-        sys.exit(1)
+        return 1
     payload = {'name': name, 'email': email, 'message': message}
     try:
         r = requests.post(API, json=payload, timeout=10)
@@ -49,3 +83,13 @@ if __name__ == '__main__':
             print('Server returned error:', j)
     except Exception as e:
         print('Failed to submit feedback:', e)
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Submit feedback to the local server.')
+    parser.add_argument('--file', help='JSON array or NDJSON file of messages to send via the batch endpoint')
+    parser.add_argument('--chunk', type=int, default=500, help='messages per batch request (default 500)')
+    args = parser.parse_args()
+    if args.file:
+        sys.exit(submit_file(args.file, max(1, args.chunk)))
+    sys.exit(submit_interactive())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Production launcher. `python server.py` runs Flask's single-process development
+server; this runs the same app under gunicorn with several worker processes, each
+serving requests from a thread pool:
+  python serve.py [--workers N] [--threads T] [--port P]
+Defaults come from WEB_WORKERS (number of CPUs), WEB_THREADS (4), PORT (3000) and
+WEB_TIMEOUT (60 seconds). Database pool sizing and SQLite pragmas are configured in
+server.py (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_BUSY_TIMEOUT_MS, SQLITE_WAL).
+gunicorn does not run on Windows; there the launcher falls back to waitress
+(one process, T threads) if it is installed.
+"""
+import os
+import sys
+import argparse
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run the portfolio server for production.')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_WORKERS', os.cpu_count() or 1)),
+                        help='worker processes (default: WEB_WORKERS or CPU count)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('WEB_THREADS', '4')),
+                        help='threads per worker (default: WEB_THREADS or 4)')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', '3000')))
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--timeout', type=int, default=int(os.environ.get('WEB_TIMEOUT', '60')))
+    return parser.parse_args()
+
+
+def prepare_database():
+    # create tables and the search index once in the parent, then drop its connections
+    # so no pooled connection is shared with the forked workers; also pre-renders
+    # responsive images when IMAGE_PREWARM_WIDTHS is set and clears old metrics snapshots
+    from server import app, db, _ensure_search_index, _feedback_total, _prewarm_images, _metrics
+    os.makedirs('data', exist_ok=True)
+    with app.app_context():
+        db.create_all()
+        _ensure_search_index()
+        # seeds the cached feedback total if init_db.py has not been run since upgrading
+        _feedback_total()
+        db.engine.dispose()
+    _prewarm_images()
+    _metrics.reset_directory()
+    return app
+
+
+def run_gunicorn(app, args):
+    from gunicorn.app.base import BaseApplication
+
+    class Launcher(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', '{}:{}'.format(args.host, args.port))
+            self.cfg.set('workers', max(1, args.workers))
+            self.cfg.set('threads', max(1, args.threads))
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('timeout', args.timeout)
+            self.cfg.set('keepalive', 5)
+            self.cfg.set('accesslog', os.environ.get('WEB_ACCESS_LOG') or None)
+
+        def load(self):
+            return app
+
+    Launcher().run()
+
+
+def run_waitress(app, args):
+    from waitress import serve
+    print('Warning: gunicorn unavailable — serving with waitress in a single process')
+    serve(app, host=args.host, port=args.port, threads=max(1, args.threads))
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    app = prepare_database()
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        try:
+            run_waitress(app, args)
+        except ImportError:
+            print('serve.py needs gunicorn (or waitress on Windows). Install with: pip install gunicorn')
+            sys.exit(1)
+    else:
+        run_gunicorn(app, args)
@@ -1,9 +1,32 @@
-from flask import Flask, request, jsonify, session, send_from_directory, Response
+from flask import Flask, request, jsonify, session, send_from_directory, send_file, Response, g
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import func
+from sqlalchemy import func, and_, or_, update, select, text, event, type_coerce
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from werkzeug.security import safe_join
 import os
 import io
-from datetime import datetime
+import sys
+import bisect
+import shutil
+import sqlite3
+import csv
+import json
+import zlib
+import base64
+import html
+import mimetypes
+import tempfile
+import mmap
+import struct
+import functools
+from collections import OrderedDict, Counter
+from contextlib import contextmanager
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import datetime, timedelta, timezone
 
 app = Flask(__name__, static_folder='public', static_url_path='/')
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET', 'change_this')
@@ -23,7 +46,336 @@ else:
 
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Connection tuning for concurrent serving (see serve.py for the production launcher)
+DB_BUSY_TIMEOUT_MS = int(os.environ.get('DB_BUSY_TIMEOUT_MS', '5000'))
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    # wait for a competing writer instead of failing with "database is locked"
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': DB_BUSY_TIMEOUT_MS / 1000.0}}
+else:
+    # per worker process: pool_size + max_overflow connections at most
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', '5')),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', '10')),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', '30')),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', '1800')),
+        'pool_pre_ping': True,
+    }
+
+
+@event.listens_for(Engine, 'connect')
+def _sqlite_pragmas(dbapi_conn, _record):
+    # WAL lets readers run alongside a writer; NORMAL sync is durable across app crashes
+    # in WAL mode and avoids an fsync per commit. Set SQLITE_WAL=0 to keep the defaults.
+    if not isinstance(dbapi_conn, sqlite3.Connection):
+        return
+    cur = dbapi_conn.cursor()
+    if os.environ.get('SQLITE_WAL', '1') == '1':
+        cur.execute('PRAGMA journal_mode=WAL')
+        cur.execute('PRAGMA synchronous=NORMAL')
+    cur.execute('PRAGMA busy_timeout={:d}'.format(DB_BUSY_TIMEOUT_MS))
+    cur.close()
+
+# --- Metrics: request/SQL latency histograms and app counters, exported at /metrics ---
+# Each worker keeps its own numbers in memory and periodically snapshots them to
+# METRICS_DIR; /metrics merges every worker's snapshot so totals cover all processes.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+METRICS_DIR = os.environ.get('METRICS_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'metrics')
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', '5'))
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', '100'))
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', '1000'))
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+METRIC_HELP = {
+    'http_requests_total': ('counter', 'HTTP requests by endpoint, method and status.'),
+    'http_request_duration_seconds': ('histogram', 'HTTP request latency, including streamed bodies.'),
+    'http_slow_requests_total': ('counter', 'Requests slower than SLOW_REQUEST_MS.'),
+    'db_query_duration_seconds': ('histogram', 'SQL statement execution time by statement type.'),
+    'db_slow_queries_total': ('counter', 'SQL statements slower than SLOW_QUERY_MS.'),
+    'riddle_solves_total': ('counter', 'Riddle answers submitted, by result.'),
+    'feedback_writes_total': ('counter', 'Feedback rows committed.'),
+}
+
+
+class _Metrics:
+    """Counters and fixed-bucket histograms for one process.
+
+    Updating is a lock, a dict lookup and a bisect, cheap enough to stay on in
+    production. Labels are tuples of (name, value) pairs.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # orders snapshot writes against reset_directory()
+        self._counters = {}
+        self._histograms = {}  # (name, labels) -> [bucket bounds, per-bucket counts (+inf last), sum]
+        self._dirty = False
+        self._pid = None
+
+    def inc(self, name, labels=(), n=1):
+        if not METRICS_ENABLED:
+            return
+        self._ensure_flusher()
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + n
+            self._dirty = True
+
+    def observe(self, name, value, buckets, labels=()):
+        if not METRICS_ENABLED:
+            return
+        self._ensure_flusher()
+        key = (name, labels)
+        with self._lock:
+            h = self._histograms.get(key)
+            if h is None:
+                h = self._histograms[key] = [buckets, [0] * (len(buckets) + 1), 0.0]
+            h[1][bisect.bisect_left(buckets, value)] += 1
+            h[2] += value
+            self._dirty = True
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, list(labels), list(h[0]), list(h[1]), h[2]]
+                               for (name, labels), h in self._histograms.items()],
+            }
+
+    def _ensure_flusher(self):
+        # one flusher thread per process; forked workers start their own and drop
+        # numbers inherited from the parent
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                if self._pid is not None:
+                    self._counters.clear()
+                    self._histograms.clear()
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            time.sleep(METRICS_FLUSH_SECONDS)
+            try:
+                self.flush()
+            except OSError as e:
+                print('Warning: could not write metrics snapshot:', e)
+
+    def _path(self, pid):
+        return os.path.join(self.directory, '{}.json'.format(pid))
+
+    def flush(self):
+        with self._flush_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp, self._path(os.getpid()))
+
+    def reset_directory(self):
+        # called by launchers before starting workers: snapshots of earlier runs
+        # (possibly with recycled pids) must not be merged in, and neither must the
+        # launcher's own startup SQL, or its flusher would write it back as a snapshot
+        with self._flush_lock:
+            with self._lock:
+                self._counters.clear()
+                self._histograms.clear()
+                self._dirty = False
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def collect(self):
+        # this process's live numbers plus the latest snapshot of every other worker
+        snapshots = [self.snapshot()]
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            names = []
+        own = os.path.basename(self._path(os.getpid()))
+        for fn in names:
+            if not fn.endswith('.json') or fn == own:
+                continue
+            try:
+                with open(os.path.join(self.directory, fn)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        counters, histograms = {}, {}
+        for snap in snapshots:
+            for name, labels, value in snap['counters']:
+                key = (name, tuple(map(tuple, labels)))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, buckets, counts, total in snap['histograms']:
+                key = (name, tuple(map(tuple, labels)))
+                h = histograms.setdefault(key, [buckets, [0] * len(counts), 0.0])
+                h[1] = [a + b for a, b in zip(h[1], counts)]
+                h[2] += total
+        return counters, histograms
+
+    def render(self):
+        counters, histograms = self.collect()
+        lines = []
+        for name in sorted({n for n, _ in counters} | {n for n, _ in histograms}):
+            kind, help_text = METRIC_HELP.get(name, ('untyped', name))
+            lines.append('# HELP {} {}'.format(name, help_text))
+            lines.append('# TYPE {} {}'.format(name, kind))
+            for (n, labels), value in sorted(counters.items()):
+                if n == name:
+                    lines.append('{}{} {}'.format(name, _prom_labels(labels), _prom_number(value)))
+            for (n, labels), (buckets, counts, total) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(buckets) + ['+Inf'], counts):
+                    cumulative += count
+                    lines.append('{}_bucket{} {}'.format(name, _prom_labels(labels + (('le', _prom_number(bound)),)), cumulative))
+                lines.append('{}_sum{} {}'.format(name, _prom_labels(labels), _prom_number(total)))
+                lines.append('{}_count{} {}'.format(name, _prom_labels(labels), cumulative))
+        return '\n'.join(lines) + '\n'
+
+
+def _prom_number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def _prom_labels(labels):
+    if not labels:
+        return ''
+    escape = lambda v: str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join('{}="{}"'.format(k, escape(v)) for k, v in labels) + '}'
+
+
+_metrics = _Metrics(METRICS_DIR)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _sql_timer_start(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _sql_timer_stop(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_metrics_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    labels = (('op', statement.lstrip().split(None, 1)[0].upper() if statement.strip() else 'OTHER'),)
+    _metrics.observe('db_query_duration_seconds', elapsed, QUERY_BUCKETS, labels)
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        _metrics.inc('db_slow_queries_total', labels)
+
+
+class _SlowRequestProfiler:
+    """Optional sampling profiler for slow requests (PROFILE_SLOW_REQUESTS=1).
+
+    A background thread samples the stacks of request threads that have been running
+    longer than SLOW_REQUEST_MS, every PROFILE_INTERVAL_MS; fast requests are never
+    sampled. When a sampled request finishes its most frequent stacks are logged.
+    """
+
+    def __init__(self, threshold, interval):
+        self.threshold = threshold
+        self.interval = interval
+        self._active = {}  # thread id -> [start, label, Counter of stacks]
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def start(self, label):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._active = {}
+                    self._pid = os.getpid()
+                    threading.Thread(target=self._run, daemon=True).start()
+        self._active[threading.get_ident()] = [time.perf_counter(), label, Counter()]
+
+    def stop(self):
+        entry = self._active.pop(threading.get_ident(), None)
+        if entry is None or not entry[2]:
+            return
+        total = sum(entry[2].values())
+        top = '\n'.join('  {:5.1f}% {}'.format(100.0 * n / total, stack) for stack, n in entry[2].most_common(5))
+        app.logger.warning('slow request %s: %d samples, top stacks (outermost first):\n%s', entry[1], total, top)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            frames = None
+            for tid, entry in list(self._active.items()):
+                if now - entry[0] < self.threshold:
+                    continue
+                if frames is None:
+                    frames = sys._current_frames()
+                frame = frames.get(tid)
+                if frame is not None:
+                    entry[2][_stack_key(frame)] += 1
+
+
+def _stack_key(frame, limit=12):
+    parts = []
+    while frame is not None and len(parts) < limit:
+        code = frame.f_code
+        parts.append('{}:{}:{}'.format(os.path.basename(code.co_filename), code.co_name, frame.f_lineno))
+        frame = frame.f_back
+    return ';'.join(reversed(parts))
+
+
+_profiler = None
+if os.environ.get('PROFILE_SLOW_REQUESTS', '0') == '1':
+    _profiler = _SlowRequestProfiler(SLOW_REQUEST_MS / 1000.0, float(os.environ.get('PROFILE_INTERVAL_MS', '10')) / 1000.0)
+
+
+@app.before_request
+def _start_request_timer():
+    g._metrics_start = time.perf_counter()
+    if _profiler is not None:
+        _profiler.start('{} {}'.format(request.method, request.path))
+
+
+@app.after_request
+def _record_request(response):
+    start = g.get('_metrics_start')
+    if start is None:
+        return response
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    method, status = request.method, response.status_code
+
+    def done():
+        # runs when the body has been fully sent, so streamed exports are timed in full
+        elapsed = time.perf_counter() - start
+        labels = (('endpoint', endpoint), ('method', method))
+        _metrics.inc('http_requests_total', labels + (('status', str(status)),))
+        _metrics.observe('http_request_duration_seconds', elapsed, REQUEST_BUCKETS, labels)
+        if elapsed * 1000 >= SLOW_REQUEST_MS:
+            _metrics.inc('http_slow_requests_total', labels)
+        if _profiler is not None:
+            _profiler.stop()
+
+    response.call_on_close(done)
+    return response
+
+
+@app.route('/metrics')
+def metrics():
+    return Response(_metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
 # initialize SQLAlchemy after ensuring data directory exists
+# Pillow powers the /img resizing endpoint; the rest of the app runs without it
+try:
+    from PIL import Image, ImageOps
+    _pil_available = True
+except Exception:
+    _pil_available = False
+
 # try to enable CORS if available; allow server to run without it
 try:
     from flask_cors import CORS
@@ -47,6 +399,255 @@ class Feedback(db.Model):
     message = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # composite index backing the (created_at, id) ordering used by /api/feedbacks
+    __table_args__ = (db.Index('ix_feedbacks_created_at_id', 'created_at', 'id'),)
+
+
+class FeedbackCounter(db.Model):
+    # incrementally maintained row counts, so listing never has to COUNT(*) the table
+    __tablename__ = 'feedback_counters'
+    name = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+class FeedbackRollup(db.Model):
+    # per hour/day submission stats, updated on every insert so /api/feedbacks/stats
+    # never aggregates the feedbacks table
+    __tablename__ = 'feedback_rollups'
+    bucket = db.Column(db.String(8), primary_key=True)  # 'hour' or 'day'
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    unique_senders = db.Column(db.Integer, nullable=False, default=0)
+    message_length = db.Column(db.BigInteger, nullable=False, default=0)  # sum, for averages
+
+
+class FeedbackRollupSender(db.Model):
+    # senders already counted in a bucket, so unique_senders can be maintained exactly
+    __tablename__ = 'feedback_rollup_senders'
+    bucket = db.Column(db.String(8), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)
+    sender = db.Column(db.String(256), primary_key=True)
+
+
+FEEDBACK_TOTAL = 'feedbacks'
+
+
+def _count_feedbacks():
+    return db.session.query(func.count(Feedback.id)).scalar() or 0
+
+
+def _seed_feedback_total(exclude=0):
+    # INSERT ... ON CONFLICT DO NOTHING, so concurrent first writers/readers cannot
+    # fail on the primary key; `exclude` leaves out rows the caller has flushed but
+    # will count itself
+    insert = _dialect_insert()
+    db.session.execute(
+        insert(FeedbackCounter)
+        .values(name=FEEDBACK_TOTAL, value=_count_feedbacks() - exclude)
+        .on_conflict_do_nothing()
+    )
+
+
+def _feedback_total():
+    row = db.session.get(FeedbackCounter, FEEDBACK_TOTAL)
+    if row is not None:
+        return row.value
+    # counter not seeded yet (init_db.py not run since upgrade): seed it once from a full count
+    _seed_feedback_total()
+    db.session.commit()
+    return db.session.get(FeedbackCounter, FEEDBACK_TOTAL).value
+
+
+def _bump_feedback_total(n=1):
+    # must run inside the same transaction as the insert it accounts for (after flush)
+    stmt = (
+        update(FeedbackCounter)
+        .where(FeedbackCounter.name == FEEDBACK_TOTAL)
+        .values(value=FeedbackCounter.value + n)
+    )
+    if db.session.execute(stmt).rowcount == 0:
+        _seed_feedback_total(exclude=n)
+        db.session.execute(stmt)
+
+
+def _cursor_key():
+    # On SQLite the keyset compares the stored created_at text itself: rows written by the
+    # legacy Node schema hold '2026-01-07 10:38:17' without microseconds, which a bound
+    # datetime (rendered as '... 10:38:17.000000') never equals. Ordering is by the same
+    # text, so comparison and ORDER BY always agree.
+    if db.engine.dialect.name == 'sqlite':
+        return type_coerce(Feedback.created_at, db.String)
+    return Feedback.created_at
+
+
+def _encode_cursor(created, fid):
+    value = created.isoformat() if isinstance(created, datetime) else created
+    raw = '{}|{}'.format(value, fid)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor):
+    # returns (created_at key, id); raises ValueError on anything malformed
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created, _, fid = raw.rpartition('|')
+        if not created:
+            raise ValueError(cursor)
+        if db.engine.dialect.name != 'sqlite':
+            created = datetime.fromisoformat(created)
+        return created, int(fid)
+    except Exception:
+        raise ValueError('bad cursor')
+
+# --- Full-text search: SQLite FTS5 (external-content table) or a PostgreSQL GIN index ---
+SEARCH_FTS_TABLE = 'feedbacks_fts'
+PG_SEARCH_DOC = "to_tsvector('english', coalesce(name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(message, ''))"
+# snippet delimiters; swapped for <mark> after the snippet text is HTML-escaped
+SNIPPET_START, SNIPPET_STOP = '\x02', '\x03'
+SEARCH_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS {t} USING fts5(name, email, message, content='feedbacks', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS {t}_ai AFTER INSERT ON feedbacks BEGIN "
+    "INSERT INTO {t}(rowid, name, email, message) VALUES (new.id, new.name, new.email, new.message); END",
+    "CREATE TRIGGER IF NOT EXISTS {t}_ad AFTER DELETE ON feedbacks BEGIN "
+    "INSERT INTO {t}({t}, rowid, name, email, message) VALUES ('delete', old.id, old.name, old.email, old.message); END",
+    "CREATE TRIGGER IF NOT EXISTS {t}_au AFTER UPDATE ON feedbacks BEGIN "
+    "INSERT INTO {t}({t}, rowid, name, email, message) VALUES ('delete', old.id, old.name, old.email, old.message); "
+    "INSERT INTO {t}(rowid, name, email, message) VALUES (new.id, new.name, new.email, new.message); END",
+)
+_search_ready = None
+
+
+def _search_backend():
+    name = db.engine.dialect.name
+    return name if name in ('sqlite', 'postgresql') else None
+
+
+def _ensure_search_index(rebuild=False):
+    # Creates the text index if it is missing (indexing existing rows when it does).
+    # Cached per process; returns False when the backend has no usable text index.
+    global _search_ready
+    if _search_ready is not None and not rebuild:
+        return _search_ready
+    backend = _search_backend()
+    try:
+        with db.engine.begin() as conn:
+            if backend == 'sqlite':
+                # external-content FTS5 table kept in sync by triggers on feedbacks, so every
+                # writer indexes its rows in its own transaction whatever this process cached
+                missing = conn.execute(
+                    text("SELECT count(*) FROM sqlite_master WHERE name IN (:t, :ai, :ad, :au)"),
+                    {'t': SEARCH_FTS_TABLE, 'ai': SEARCH_FTS_TABLE + '_ai',
+                     'ad': SEARCH_FTS_TABLE + '_ad', 'au': SEARCH_FTS_TABLE + '_au'}).scalar() < 4
+                if missing:
+                    for ddl in SEARCH_FTS_DDL:
+                        conn.execute(text(ddl.format(t=SEARCH_FTS_TABLE)))
+                if rebuild or missing:
+                    conn.execute(text("INSERT INTO {0}({0}) VALUES ('rebuild')".format(SEARCH_FTS_TABLE)))
+            elif backend == 'postgresql':
+                # an expression index is maintained by PostgreSQL itself on every insert
+                conn.execute(text("CREATE INDEX IF NOT EXISTS ix_feedbacks_search ON feedbacks USING gin ({})"
+                                  .format(PG_SEARCH_DOC)))
+        _search_ready = backend is not None
+    except OperationalError as e:
+        print('Warning: full-text search unavailable:', e)
+        if 'no such module' not in str(e):
+            # transient (e.g. database locked): try again next time
+            return False
+        # sqlite built without FTS5
+        _search_ready = False
+    return _search_ready
+
+
+def _fts5_query(q):
+    # quote every term so user input can never be parsed as FTS5 syntax; terms are ANDed
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in q.split())
+
+
+def _render_snippet(snippet):
+    return html.escape(snippet or '').replace(SNIPPET_START, '<mark>').replace(SNIPPET_STOP, '</mark>')
+
+
+# --- Analytics rollups ---
+ROLLUP_BUCKETS = {'hour': timedelta(hours=1), 'day': timedelta(days=1)}
+ROLLUP_DEFAULT_SPAN = {'hour': timedelta(hours=48), 'day': timedelta(days=30)}
+
+
+def _bucket_start(ts, bucket):
+    ts = ts.replace(minute=0, second=0, microsecond=0)
+    return ts.replace(hour=0) if bucket == 'day' else ts
+
+
+def _rollup_sender(name, email):
+    # anonymous submissions count towards totals but not unique senders
+    return (email or name or '').strip().lower()[:256] or None
+
+
+def _rollup_deltas(rows):
+    # rows are (name, email, message, created_at); returns {(bucket, start): [count, length, senders]}
+    deltas = {}
+    for name, email, message, created in rows:
+        sender = _rollup_sender(name, email)
+        for bucket in ROLLUP_BUCKETS:
+            d = deltas.setdefault((bucket, _bucket_start(created, bucket)), [0, 0, set()])
+            d[0] += 1
+            d[1] += len(message or '')
+            if sender:
+                d[2].add(sender)
+    return deltas
+
+
+def _dialect_insert():
+    # INSERT ... ON CONFLICT support for the backends we run on
+    if db.engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def _apply_rollups(deltas):
+    # runs in the caller's transaction
+    insert = _dialect_insert()
+    for (bucket, start), (count, length, senders) in deltas.items():
+        new_senders = 0
+        if senders:
+            res = db.session.execute(
+                insert(FeedbackRollupSender)
+                .values([{'bucket': bucket, 'bucket_start': start, 'sender': s} for s in senders])
+                .on_conflict_do_nothing()
+            )
+            new_senders = res.rowcount
+        stmt = insert(FeedbackRollup).values(bucket=bucket, bucket_start=start, count=count,
+                                             unique_senders=new_senders, message_length=length)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['bucket', 'bucket_start'],
+            set_={
+                'count': FeedbackRollup.count + stmt.excluded['count'],
+                'unique_senders': FeedbackRollup.unique_senders + stmt.excluded['unique_senders'],
+                'message_length': FeedbackRollup.message_length + stmt.excluded['message_length'],
+            },
+        ))
+
+
+def _rebuild_rollups(chunk=5000):
+    # backfill: recompute every rollup from the feedbacks table in one pass
+    db.session.query(FeedbackRollupSender).delete()
+    db.session.query(FeedbackRollup).delete()
+    stmt = select(Feedback.name, Feedback.email, Feedback.message, Feedback.created_at) \
+        .where(Feedback.created_at.isnot(None))
+    deltas = {}
+    with db.engine.connect() as conn:
+        for rows in conn.execution_options(stream_results=True).execute(stmt).partitions(chunk):
+            for key, (count, length, senders) in _rollup_deltas(rows).items():
+                d = deltas.setdefault(key, [0, 0, set()])
+                d[0] += count
+                d[1] += length
+                d[2] |= senders
+    _apply_rollups(deltas)
+    db.session.commit()
+    return len(deltas)
+
+
 # Riddle feature removed: `GET /riddle`, `POST /solve`, and debug helper removed
 
 # --- Riddle feature: restores /riddle and /solve endpoints ---
@@ -106,7 +707,9 @@ def solve():
         return jsonify({'ok': False, 'error': 'no-riddle'})
     if guess == session.get('answer'):
         session['unlocked'] = True
+        _metrics.inc('riddle_solves_total', (('result', 'correct'),))
         return jsonify({'ok': True})
+    _metrics.inc('riddle_solves_total', (('result', 'wrong'),))
     return jsonify({'ok': False})
 
 
@@ -118,75 +721,702 @@ def debug_answer():
     return jsonify({'ok': True, 'answer': session.get('answer')})
 
 
+# --- Response caching: ETags keyed on a cross-process data version ---
+try:
+    import fcntl
+except ImportError:
+    # Windows: serve.py runs a single waitress process there, the thread lock suffices
+    fcntl = None
+
+DATA_VERSION_FILE = os.environ.get('DATA_VERSION_FILE') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'feedback.version')
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', '256'))
+
+
+@contextmanager
+def _file_lock(fd):
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+class _DataVersion:
+    """Counter bumped by every feedback write, shared by all worker processes.
+
+    Lives in a small memory-mapped file (8 random epoch bytes + 8-byte counter), so
+    reading it costs no database query and no syscall. The epoch changes whenever the
+    file is recreated, so ETags handed out before that can never match again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = None
+        self._mm = None
+
+    def _map(self):
+        if self._mm is None:
+            with self._lock:
+                if self._mm is None:
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                    fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                    with _file_lock(fd):
+                        if os.fstat(fd).st_size < 16:
+                            os.ftruncate(fd, 16)
+                            os.lseek(fd, 0, os.SEEK_SET)
+                            os.write(fd, os.urandom(8))
+                    self._fd = fd
+                    self._mm = mmap.mmap(fd, 16)
+        return self._mm
+
+    def get(self):
+        epoch, counter = struct.unpack_from('<8sQ', self._map())
+        return '{}-{:x}'.format(epoch.hex(), counter)
+
+    def bump(self):
+        mm = self._map()
+        with self._lock, _file_lock(self._fd):
+            struct.pack_into('<Q', mm, 8, struct.unpack_from('<Q', mm, 8)[0] + 1)
+
+
+_data_version = _DataVersion(DATA_VERSION_FILE)
+_response_cache = OrderedDict()  # full path -> (etag, body); LRU bounded by RESPONSE_CACHE_SIZE
+_response_cache_lock = threading.Lock()
+
+
+def _cached_json(version):
+    """Cache a JSON GET view per URL under an ETag derived from `version()`.
+
+    A matching If-None-Match gets a 304 and a repeated URL gets the stored body, both
+    without running the view. Only 200 responses are cached.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            key = request.full_path
+            etag = '{}-{:x}'.format(version(), zlib.crc32(key.encode('utf-8')))
+            if etag in request.if_none_match:
+                resp = Response(status=304)
+            else:
+                with _response_cache_lock:
+                    cached = _response_cache.get(key)
+                    if cached is not None:
+                        _response_cache.move_to_end(key)
+                if cached is not None and cached[0] == etag:
+                    body = cached[1]
+                else:
+                    resp = app.make_response(view(*args, **kwargs))
+                    if resp.status_code != 200:
+                        return resp
+                    body = resp.get_data()
+                    with _response_cache_lock:
+                        _response_cache[key] = (etag, body)
+                        _response_cache.move_to_end(key)
+                        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+                            _response_cache.popitem(last=False)
+                resp = Response(body, mimetype='application/json')
+            resp.set_etag(etag)
+            # browsers may keep the body but must revalidate it each time
+            resp.cache_control.no_cache = True
+            return resp
+        return wrapper
+    return decorator
+
+
+def _clean_feedback(data):
+    # normalise one submitted message; returns None when it has no message text
+    if not isinstance(data, dict):
+        return None
+    name = str(data.get('name') or '').strip()
+    email = str(data.get('email') or '').strip()
+    message = str(data.get('message') or '').strip()
+    if not message:
+        return None
+    return {'name': name or None, 'email': email or None, 'message': message}
+
+
+def _store_feedbacks(items):
+    # the one write path for feedback rows: inserts all items in a single transaction
+    # and returns their ids in order
+    _ensure_search_index()
+    rows = [Feedback(**item) for item in items]
+    db.session.add_all(rows)
+    db.session.flush()
+    ids = [r.id for r in rows]
+    _apply_rollups(_rollup_deltas((r.name, r.email, r.message, r.created_at) for r in rows))
+    _bump_feedback_total(len(rows))
+    # the commit is the last step allowed to fail: callers (and the group committer's
+    # per-item retry) treat an exception as "nothing was stored"
+    db.session.commit()
+    try:
+        _data_version.bump()
+        _metrics.inc('feedback_writes_total', n=len(ids))
+    except Exception as e:
+        app.logger.warning('feedback rows %s committed, but post-commit bookkeeping failed: %s', ids, e)
+    return ids
+
+
+class _GroupCommitter:
+    """Coalesces concurrent single submissions into shared transactions.
+
+    Request threads enqueue a cleaned item and block on a Future; one writer thread per
+    process drains the queue (up to `max_batch` items, waiting at most `max_wait` seconds
+    for stragglers) and commits each batch with a single fsync. If a batch fails, its
+    items are retried one transaction each.
+    """
+
+    def __init__(self, max_batch=256, max_wait=0.005):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+
+    def submit(self, item, timeout=30):
+        self._ensure_writer()
+        fut = Future()
+        self._queue.put((item, fut))
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeout:
+            # only give up while the item is still queued; once the writer has taken it
+            # into a batch the row may be committed, so wait for the real outcome
+            if fut.cancel():
+                raise
+            return fut.result()
+
+    def _ensure_writer(self):
+        # (re)start the writer lazily so forked worker processes each get their own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                threading.Thread(target=self._run, args=(self._queue,), daemon=True).start()
+                self._pid = os.getpid()
+
+    def _run(self, q):
+        while True:
+            batch = [q.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(q.get(timeout=remaining) if remaining > 0 else q.get_nowait())
+                except queue.Empty:
+                    break
+            # claim the items; ones whose caller already timed out are dropped
+            batch = [(item, fut) for item, fut in batch if fut.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            with app.app_context():
+                try:
+                    ids = _store_feedbacks([item for item, _ in batch])
+                except Exception:
+                    db.session.rollback()
+                    self._store_each(batch)
+                    continue
+            for (_, fut), fid in zip(batch, ids):
+                fut.set_result(fid)
+
+    def _store_each(self, batch):
+        # the shared transaction failed: retry every item on its own so only the
+        # caller whose item is bad gets the error
+        for item, fut in batch:
+            try:
+                fid = _store_feedbacks([item])[0]
+            except Exception as e:
+                db.session.rollback()
+                fut.set_exception(e)
+            else:
+                fut.set_result(fid)
+
+
+# FEEDBACK_GROUP_COMMIT=1 routes POST /api/feedback through the group committer
+_group_committer = None
+if os.environ.get('FEEDBACK_GROUP_COMMIT', '0') == '1':
+    _group_committer = _GroupCommitter(
+        max_batch=int(os.environ.get('FEEDBACK_GROUP_COMMIT_MAX', '256')),
+        max_wait=int(os.environ.get('FEEDBACK_GROUP_COMMIT_MS', '5')) / 1000.0,
+    )
+
+FEEDBACK_BATCH_MAX = int(os.environ.get('FEEDBACK_BATCH_MAX', '1000'))
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
 @app.route('/api/feedback', methods=['POST'])
 def submit_feedback():
-    data = request.get_json() or request.form
-    name = (data.get('name') or '').strip()
-    email = (data.get('email') or '').strip()
-    message = (data.get('message') or '').strip()
-    if not message:
+    data = request.get_json(silent=True) or request.form
+    item = _clean_feedback(data)
+    if item is None:
         return jsonify({'ok': False, 'error': 'empty-message'}), 400
-    fb = Feedback(name=name or None, email=email or None, message=message)
-    db.session.add(fb)
-    db.session.commit()
-    return jsonify({'ok': True, 'id': fb.id})
+    if _group_committer is not None:
+        fid = _group_committer.submit(item)
+    else:
+        fid = _store_feedbacks([item])[0]
+    return jsonify({'ok': True, 'id': fid})
+
+
+@app.route('/api/feedback/batch', methods=['POST'])
+def submit_feedback_batch():
+    # body is a JSON array of messages, or NDJSON (one message object per line)
+    if request.mimetype in NDJSON_TYPES:
+        try:
+            data = [json.loads(line) for line in request.get_data(as_text=True).splitlines() if line.strip()]
+        except ValueError:
+            return jsonify({'ok': False, 'error': 'bad-json'}), 400
+    else:
+        data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        return jsonify({'ok': False, 'error': 'expected-array'}), 400
+    if not data:
+        return jsonify({'ok': False, 'error': 'empty-batch'}), 400
+    if len(data) > FEEDBACK_BATCH_MAX:
+        return jsonify({'ok': False, 'error': 'batch-too-large', 'max': FEEDBACK_BATCH_MAX}), 413
+    items = [_clean_feedback(d) for d in data]
+    # all-or-nothing: report every invalid entry and insert none
+    invalid = [i for i, item in enumerate(items) if item is None]
+    if invalid:
+        return jsonify({'ok': False, 'error': 'empty-message', 'invalid': invalid}), 400
+    ids = _store_feedbacks(items)
+    return jsonify({'ok': True, 'count': len(ids), 'ids': ids})
 
 
 @app.route('/api/feedbacks')
+@_cached_json(_data_version.get)
 def list_feedbacks():
+    # Two modes: legacy `page`/`pageSize` (OFFSET), or keyset mode when `cursor` is
+    # present (empty for the first page) which stays fast no matter how deep you go.
+    try:
+        pageSize = max(1, min(500, int(request.args.get('pageSize', '20'))))
+    except ValueError:
+        pageSize = 20
+    cursor = request.args.get('cursor')
+    key = _cursor_key()
+    query = db.session.query(Feedback, key).order_by(key.desc(), Feedback.id.desc())
+    if cursor is not None:
+        page = None
+        if cursor:
+            try:
+                c_created, c_id = _decode_cursor(cursor)
+            except ValueError:
+                return jsonify({'ok': False, 'error': 'bad-cursor'}), 400
+            query = query.filter(or_(
+                key < c_created,
+                and_(key == c_created, Feedback.id < c_id),
+            ))
+    else:
+        try:
+            page = max(1, int(request.args.get('page', '1')))
+        except ValueError:
+            page = 1
+        query = query.offset((page-1)*pageSize)
+    # fetch one extra row to know whether another page exists
+    rows = query.limit(pageSize + 1).all()
+    has_more = len(rows) > pageSize
+    rows = rows[:pageSize]
+    total = _feedback_total()
+    next_cursor = _encode_cursor(rows[-1][1], rows[-1][0].id) if has_more and rows else None
+    feedbacks = [ { 'id': r.id, 'name': r.name, 'email': r.email, 'message': r.message, 'created_at': r.created_at.isoformat() } for r, _ in rows ]
+    out = {'ok': True, 'total': total, 'pageSize': pageSize, 'feedbacks': feedbacks, 'next_cursor': next_cursor}
+    if page is not None:
+        out['page'] = page
+    return jsonify(out)
+
+
+@app.route('/api/feedbacks/search')
+@_cached_json(_data_version.get)
+def search_feedbacks():
+    # ranked full-text search; `snippet` is HTML-escaped with matches wrapped in <mark>
+    q = (request.args.get('q') or '').strip()
+    if not q:
+        return jsonify({'ok': False, 'error': 'empty-query'}), 400
     try:
         page = max(1, int(request.args.get('page', '1')))
     except ValueError:
         page = 1
     try:
-        pageSize = max(1, min(500, int(request.args.get('pageSize', '20'))))
+        pageSize = max(1, min(100, int(request.args.get('pageSize', '20'))))
     except ValueError:
         pageSize = 20
-    total = db.session.query(func.count(Feedback.id)).scalar()
-    rows = Feedback.query.order_by(Feedback.created_at.desc()).limit(pageSize).offset((page-1)*pageSize).all()
-    feedbacks = [ { 'id': r.id, 'name': r.name, 'email': r.email, 'message': r.message, 'created_at': r.created_at.isoformat() } for r in rows ]
-    return jsonify({'ok': True, 'total': total, 'page': page, 'pageSize': pageSize, 'feedbacks': feedbacks})
+    if not _ensure_search_index():
+        return jsonify({'ok': False, 'error': 'search-unavailable'}), 501
+    params = {'limit': pageSize, 'offset': (page-1)*pageSize}
+    if _search_backend() == 'sqlite':
+        params['q'] = _fts5_query(q)
+        params['start'], params['stop'] = SNIPPET_START, SNIPPET_STOP
+        count_sql = "SELECT count(*) FROM {0} WHERE {0} MATCH :q".format(SEARCH_FTS_TABLE)
+        rows_sql = (
+            "SELECT f.id, f.name, f.email, f.created_at, "
+            "snippet({0}, 2, :start, :stop, '…', 16) AS snippet, -bm25({0}) AS rank "
+            "FROM {0} JOIN feedbacks f ON f.id = {0}.rowid "
+            "WHERE {0} MATCH :q ORDER BY bm25({0}), f.id DESC LIMIT :limit OFFSET :offset"
+        ).format(SEARCH_FTS_TABLE)
+    else:
+        params['q'] = q
+        params['opts'] = 'StartSel={}, StopSel={}, MaxWords=32, MinWords=8'.format(SNIPPET_START, SNIPPET_STOP)
+        count_sql = "SELECT count(*) FROM feedbacks WHERE {} @@ websearch_to_tsquery('english', :q)".format(PG_SEARCH_DOC)
+        rows_sql = (
+            "SELECT id, name, email, created_at, "
+            "ts_headline('english', message, websearch_to_tsquery('english', :q), :opts) AS snippet, "
+            "ts_rank({0}, websearch_to_tsquery('english', :q)) AS rank "
+            "FROM feedbacks WHERE {0} @@ websearch_to_tsquery('english', :q) "
+            "ORDER BY rank DESC, id DESC LIMIT :limit OFFSET :offset"
+        ).format(PG_SEARCH_DOC)
+    total = db.session.execute(text(count_sql), params).scalar()
+    # typed so created_at comes back as a datetime on sqlite too
+    rows = db.session.execute(text(rows_sql).columns(created_at=db.DateTime), params).mappings().all()
+    results = [ { 'id': r['id'], 'name': r['name'], 'email': r['email'], 'snippet': _render_snippet(r['snippet']),
+                  'created_at': r['created_at'].isoformat() if r['created_at'] else None, 'rank': float(r['rank']) } for r in rows ]
+    return jsonify({'ok': True, 'q': q, 'total': total, 'page': page, 'pageSize': pageSize, 'results': results})
+
+
+def _parse_utc(value):
+    # rollups are stored as naive UTC; accept offsets and the 'Z' suffix of JS toISOString()
+    ts = datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith(('Z', 'z')) else value)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+@app.route('/api/feedbacks/stats')
+def feedback_stats():
+    # reads only the rollup rows in [from, to), so cost tracks the range, not the table
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in ROLLUP_BUCKETS:
+        return jsonify({'ok': False, 'error': 'bad-bucket', 'buckets': sorted(ROLLUP_BUCKETS)}), 400
+    try:
+        end = _parse_utc(request.args['to']) if request.args.get('to') else datetime.utcnow()
+        start = _parse_utc(request.args['from']) if request.args.get('from') else end - ROLLUP_DEFAULT_SPAN[bucket]
+    except (ValueError, OverflowError):
+        return jsonify({'ok': False, 'error': 'bad-range'}), 400
+    start = _bucket_start(start, bucket)
+    in_range = and_(FeedbackRollup.bucket == bucket, FeedbackRollup.bucket_start >= start,
+                    FeedbackRollup.bucket_start < end)
+    rows = FeedbackRollup.query.filter(in_range).order_by(FeedbackRollup.bucket_start).all()
+    buckets = [ { 'start': r.bucket_start.isoformat(), 'count': r.count, 'unique_senders': r.unique_senders,
+                  'avg_length': round(r.message_length / r.count, 1) if r.count else 0 } for r in rows ]
+    count = sum(r.count for r in rows)
+    length = sum(r.message_length for r in rows)
+    # senders active in several buckets must only be counted once across the range
+    unique = db.session.query(func.count(func.distinct(FeedbackRollupSender.sender))).filter(
+        FeedbackRollupSender.bucket == bucket, FeedbackRollupSender.bucket_start >= start,
+        FeedbackRollupSender.bucket_start < end).scalar()
+    summary = {'count': count, 'unique_senders': unique, 'avg_length': round(length / count, 1) if count else 0}
+    return jsonify({'ok': True, 'bucket': bucket, 'from': start.isoformat(), 'to': end.isoformat(),
+                    'summary': summary, 'buckets': buckets})
+
+
+EXPORT_COLUMNS = ('id', 'name', 'email', 'message', 'created_at')
+EXPORT_CHUNK = int(os.environ.get('EXPORT_CHUNK', '2000'))
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'feedbacks.csv'),
+    'ndjson': ('application/x-ndjson; charset=utf-8', 'feedbacks.ndjson'),
+}
+
+
+def _export_csv_chunks(partitions):
+    buf = io.StringIO()
+    writer = csv.writer(buf, quoting=csv.QUOTE_ALL, lineterminator='\n')
+    yield ','.join(EXPORT_COLUMNS) + '\n'
+    for rows in partitions:
+        writer.writerows((fid, name or '', email or '', message or '', created.isoformat() if created else '')
+                         for fid, name, email, message, created in rows)
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate(0)
+
+
+def _export_ndjson_chunks(partitions):
+    for rows in partitions:
+        yield ''.join(json.dumps({'id': fid, 'name': name, 'email': email, 'message': message,
+                                  'created_at': created.isoformat() if created else None}) + '\n'
+                      for fid, name, email, message, created in rows)
+
+
+def _gzip_chunks(chunks):
+    # wbits=31 produces a gzip container; sync-flush per chunk so the client sees progress
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = z.compress(chunk.encode('utf-8')) + z.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield z.flush()
 
 
 @app.route('/api/feedbacks.csv')
-def export_csv():
+@app.route('/api/feedbacks.ndjson', defaults={'fmt': 'ndjson'})
+def export_csv(fmt=None):
+    # Streams plain column tuples over a server-side cursor in EXPORT_CHUNK partitions,
+    # so memory stays flat regardless of how many rows are exported.
+    fmt = (fmt or request.args.get('format', 'csv')).lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'ok': False, 'error': 'bad-format', 'formats': sorted(EXPORT_FORMATS)}), 400
     all_rows = request.args.get('all','').lower() in ('1','true','yes')
+    stmt = select(Feedback.id, Feedback.name, Feedback.email, Feedback.message, Feedback.created_at) \
+        .order_by(Feedback.created_at.desc(), Feedback.id.desc())
+    if not all_rows:
+        try:
+            page = max(1, int(request.args.get('page', '1')))
+        except ValueError:
+            page = 1
+        try:
+            pageSize = max(1, min(5000, int(request.args.get('pageSize', '1000'))))
+        except ValueError:
+            pageSize = 1000
+        stmt = stmt.limit(pageSize).offset((page-1)*pageSize)
+    use_gzip = request.accept_encodings['gzip'] > 0
+    engine = db.engine
+
     def generate():
-        out = io.StringIO()
-        out.write('id,name,email,message,created_at\n')
-        yield out.getvalue()
-        out.seek(0)
-        out.truncate(0)
-        query = Feedback.query.order_by(Feedback.created_at.desc())
-        if not all_rows:
-            try:
-                page = max(1, int(request.args.get('page', '1')))
-            except ValueError:
-                page = 1
-            try:
-                pageSize = max(1, min(5000, int(request.args.get('pageSize', '1000'))))
-            except ValueError:
-                pageSize = 1000
-            query = query.limit(pageSize).offset((page-1)*pageSize)
-        for r in query:
-            # escape double quotes
-            row = '"{}","{}","{}","{}","{}"\n'.format(r.id, (r.name or '').replace('"','""'), (r.email or '').replace('"','""'), (r.message or '').replace('"','""'), r.created_at.isoformat())
-            yield row
+        # a dedicated connection (not the request session) so it outlives the app context
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(stmt)
+            partitions = result.partitions(EXPORT_CHUNK)
+            if fmt == 'ndjson':
+                yield from _export_ndjson_chunks(partitions)
+            else:
+                yield from _export_csv_chunks(partitions)
 
+    content_type, filename = EXPORT_FORMATS[fmt]
     headers = {
-        'Content-Type': 'text/csv; charset=utf-8',
-        'Content-Disposition': 'attachment; filename=feedbacks.csv'
+        'Content-Type': content_type,
+        'Content-Disposition': 'attachment; filename=' + filename,
+        'Vary': 'Accept-Encoding',
     }
-    return Response(generate(), headers=headers)
+    body = generate()
+    if use_gzip:
+        headers['Content-Encoding'] = 'gzip'
+        body = _gzip_chunks(body)
+    return Response(body, headers=headers)
+
+
+# --- Static assets: fingerprinted, precompressed build from scripts/build_assets.py ---
+# When build/manifest.json exists its files are served instead of public/ (restart the
+# server after rebuilding); anything the manifest does not know comes from public/.
+STATIC_BUILD_DIR = os.environ.get('STATIC_BUILD_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'build')
+ASSET_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))  # preference order
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+
+def _load_assets():
+    # maps request path -> (manifest entry, immutable); hashed names are immutable
+    try:
+        with open(os.path.join(STATIC_BUILD_DIR, 'manifest.json'), encoding='utf-8') as f:
+            files = json.load(f)['files']
+    except (OSError, ValueError, KeyError):
+        return {}
+    assets = {}
+    for rel, entry in files.items():
+        assets[rel] = (entry, False)
+        if entry['file'] != rel:
+            assets[entry['file']] = (entry, True)
+    return assets
+
+
+_assets = _load_assets()
+
+
+def _send_asset(filename):
+    found = _assets.get(filename)
+    if found is None:
+        return send_from_directory(app.static_folder, filename)
+    entry, immutable = found
+    encoding, suffix = next(((e, sfx) for e, sfx in ASSET_ENCODINGS
+                             if e in entry['encodings'] and request.accept_encodings[e] > 0), (None, ''))
+    # strong ETag per representation, since each encoding has different bytes
+    etag = entry['hash'] + ('-' + encoding if encoding else '')
+    resp = send_from_directory(STATIC_BUILD_DIR, entry['file'] + suffix,
+                               mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+                               etag=etag, max_age=ASSET_MAX_AGE if immutable else None)
+    if encoding:
+        resp.headers['Content-Encoding'] = encoding
+        # would otherwise name the .gz/.br file on disk
+        del resp.headers['Content-Disposition']
+    resp.vary.add('Accept-Encoding')
+    if immutable:
+        resp.cache_control.immutable = True
+    else:
+        # unhashed names can change on the next build: always revalidate via the ETag
+        resp.cache_control.no_cache = True
+        resp.cache_control.max_age = None
+        resp.cache_control.public = False
+    return resp
+
+
+# every static request (the /<path:filename> route of static_folder) goes through the build
+app.view_functions['static'] = _send_asset
+
+
+# --- Responsive images: /img/<name>?w=&fmt= resized with Pillow into a bounded disk cache ---
+IMAGE_SOURCE_DIR = os.path.join(app.static_folder, 'assets')
+IMAGE_CACHE_DIR = os.environ.get('IMAGE_CACHE_DIR') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'img-cache')
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_MB', '64')) * 1024 * 1024
+# requested widths snap up to one of these so clients cannot fill the cache with variants
+IMAGE_WIDTHS = (160, 320, 480, 640, 960, 1280, 1920)
+IMAGE_FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'png': ('PNG', 'image/png', {'optimize': True}),
+    'jpeg': ('JPEG', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+IMAGE_MAX_AGE = int(os.environ.get('IMAGE_MAX_AGE', '86400'))
+
+
+class _ImageCache:
+    """Size-bounded directory of rendered variants with LRU eviction.
+
+    A hit refreshes the file's mtime, so eviction removes the least recently used
+    files first. Concurrent requests for the same variant in this process wait for a
+    single render; renders in other processes are safe because files are written to a
+    temporary name and moved into place atomically. The size bound covers the whole
+    directory, whichever worker process wrote the files.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def get(self, key, render):
+        path = os.path.join(self.directory, key)
+        if self._touch(path):
+            return path
+        with self._lock:
+            key_lock = self._inflight.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                if self._touch(path):
+                    return path
+                data = render()
+                os.makedirs(self.directory, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp, path)
+                self._added()
+                return path
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _entries(self):
+        with os.scandir(self.directory) as it:
+            return [(e.stat().st_mtime, e.stat().st_size, e.path) for e in it
+                    if e.is_file() and not e.name.endswith('.tmp')]
+
+    def _added(self):
+        # every worker writes into the same directory, so size it from disk on each new
+        # file rather than from local counts; writes are rare (one per variant)
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return
+            # evict the least recently used files down to 90% of the limit
+            for _, size, path in entries:
+                if total <= self.max_bytes * 0.9:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
+
+
+_image_cache = _ImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES)
+
+
+def _image_source(name):
+    # returns the path of a raster image under public/assets, or None
+    path = safe_join(IMAGE_SOURCE_DIR, name)
+    mimetype = mimetypes.guess_type(path or '')[0] or ''
+    if path is None or not os.path.isfile(path) or not mimetype.startswith('image/') or mimetype == 'image/svg+xml':
+        return None
+    return path
+
+
+def _render_image(src, width, fmt):
+    pil_format, _, options = IMAGE_FORMATS[fmt]
+    with Image.open(src) as img:
+        img = ImageOps.exif_transpose(img)
+        if width < img.width:
+            img.thumbnail((width, img.height), Image.LANCZOS)
+        if pil_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        out = io.BytesIO()
+        img.save(out, pil_format, **options)
+        return out.getvalue()
+
+
+def _image_variant(src, width, fmt):
+    # the key includes the source's size and mtime so replacing an asset invalidates it
+    st = os.stat(src)
+    stem = os.path.relpath(src, IMAGE_SOURCE_DIR).replace(os.sep, '_').rsplit('.', 1)[0]
+    key = '{}.{:x}-{:x}.w{}.{}'.format(stem, st.st_size, int(st.st_mtime), width, fmt)
+    return key, _image_cache.get(key, lambda: _render_image(src, width, fmt))
+
+
+@app.route('/img/<path:name>')
+def image(name):
+    if not _pil_available:
+        return jsonify({'ok': False, 'error': 'images-unavailable'}), 501
+    src = _image_source(name)
+    if src is None:
+        return jsonify({'ok': False, 'error': 'not-found'}), 404
+    try:
+        requested = int(request.args.get('w', IMAGE_WIDTHS[-1]))
+    except ValueError:
+        return jsonify({'ok': False, 'error': 'bad-width'}), 400
+    width = next((w for w in IMAGE_WIDTHS if w >= requested), IMAGE_WIDTHS[-1])
+    fmt = (request.args.get('fmt') or os.path.splitext(src)[1].lstrip('.')).lower().replace('jpg', 'jpeg')
+    if fmt not in IMAGE_FORMATS:
+        return jsonify({'ok': False, 'error': 'bad-format', 'formats': sorted(IMAGE_FORMATS)}), 400
+    key, path = _image_variant(src, width, fmt)
+    resp = send_file(path, mimetype=IMAGE_FORMATS[fmt][1], etag=key, max_age=IMAGE_MAX_AGE)
+    del resp.headers['Content-Disposition']
+    return resp
+
+
+def _prewarm_images():
+    # optional: IMAGE_PREWARM_WIDTHS=320,640 (and IMAGE_PREWARM_FORMATS, default webp)
+    # renders those variants of every asset ahead of the first request
+    widths = [int(w) for w in os.environ.get('IMAGE_PREWARM_WIDTHS', '').split(',') if w.strip()]
+    formats = [f.strip() for f in os.environ.get('IMAGE_PREWARM_FORMATS', 'webp').split(',') if f.strip() in IMAGE_FORMATS]
+    if not widths or not _pil_available:
+        return 0
+    count = 0
+    for dirpath, _, filenames in os.walk(IMAGE_SOURCE_DIR):
+        for fn in filenames:
+            src = _image_source(os.path.relpath(os.path.join(dirpath, fn), IMAGE_SOURCE_DIR))
+            if src is None:
+                continue
+            for width in widths:
+                for fmt in formats:
+                    _image_variant(src, width, fmt)
+                    count += 1
+    return count
 
 
-# Serve index and static files from public/ (Flask static is already configured)
 @app.route('/')
 def index():
     # require riddle unlock to view the portfolio home
-    if not session.get('unlocked'):
-        return send_from_directory(app.static_folder, 'riddle.html')
-    return send_from_directory(app.static_folder, 'index.html')
+    resp = _send_asset('index.html' if session.get('unlocked') else 'riddle.html')
+    # the same URL serves two pages depending on the session: never share or reuse blindly
+    resp.cache_control.private = True
+    resp.cache_control.no_cache = True
+    return resp
 
 # simple config endpoint used by the front-end to populate links
 LINKS = {
@@ -197,7 +1427,12 @@ LINKS = {
     'blog': '/blog.html'
 }
 
+# LINKS never changes at runtime, so its ETag is fixed
+_LINKS_VERSION = '{:x}'.format(zlib.crc32(json.dumps(LINKS, sort_keys=True).encode('utf-8')))
+
+
 @app.route('/config')
+@_cached_json(lambda: _LINKS_VERSION)
 def config():
     return jsonify({'links': LINKS})
 
@@ -211,5 +1446,7 @@ if __name__ == '__main__':
     os.makedirs('data', exist_ok=True)
     with app.app_context():
         db.create_all()
+    _prewarm_images()
+    _metrics.reset_directory()
     port = int(os.environ.get('PORT', '3000'))
     app.run(host='0.0.0.0', port=port, debug=True)
@@ -0,0 +1,70 @@
+"""
+Cursor pagination over /api/feedbacks, including rows stored by the legacy Node
+schema (`DEFAULT CURRENT_TIMESTAMP`), whose created_at has no microseconds.
+"""
+import os
+import sys
+import tempfile
+
+_tmp = tempfile.mkdtemp(prefix='feedback-test-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmp, 'test.db').replace('\\', '/')
+os.environ['DATA_VERSION_FILE'] = os.path.join(_tmp, 'feedback.version')
+os.environ['METRICS_ENABLED'] = '0'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import text
+from server import app, db, _data_version
+
+# (id, created_at as stored): second precision like the shipped data/feedback.db,
+# four rows sharing one second, and one row written by SQLAlchemy with microseconds
+ROWS = [
+    (1, '2026-01-07 10:38:17'),
+    (2, '2026-01-07 10:39:00'),
+    (3, '2026-01-08 09:00:00'),
+    (4, '2026-01-08 09:00:00'),
+    (5, '2026-01-08 09:00:00'),
+    (6, '2026-01-08 09:00:00'),
+    (7, '2026-01-08 09:00:00.250000'),
+]
+EXPECTED = [7, 6, 5, 4, 3, 2, 1]
+
+
+@pytest.fixture(scope='module')
+def client():
+    with app.app_context():
+        db.create_all()
+        db.session.execute(text('DELETE FROM feedbacks'))
+        db.session.execute(
+            text("INSERT INTO feedbacks (id, name, email, message, created_at) VALUES (:id, NULL, NULL, 'm', :created)"),
+            [{'id': fid, 'created': created} for fid, created in ROWS],
+        )
+        db.session.commit()
+    _data_version.bump()
+    return app.test_client()
+
+
+def walk(client, page_size):
+    ids, cursor = [], ''
+    for _ in range(len(ROWS) + 2):
+        j = client.get('/api/feedbacks', query_string={'cursor': cursor, 'pageSize': page_size}).get_json()
+        assert j['ok']
+        ids += [f['id'] for f in j['feedbacks']]
+        cursor = j['next_cursor']
+        if cursor is None:
+            return ids
+    pytest.fail('cursor walk did not terminate: {}'.format(ids))
+
+
+@pytest.mark.parametrize('page_size', [1, 2, 3, 7, 20])
+def test_cursor_walk_over_second_precision_rows(client, page_size):
+    assert walk(client, page_size) == EXPECTED
+
+
+def test_page_mode_matches_cursor_order(client):
+    j = client.get('/api/feedbacks', query_string={'page': 2, 'pageSize': 3}).get_json()
+    assert [f['id'] for f in j['feedbacks']] == EXPECTED[3:6]
+
+
+def test_bad_cursor_is_rejected(client):
+    assert client.get('/api/feedbacks', query_string={'cursor': 'not-a-cursor'}).status_code == 400